@@ -1,11 +1,31 @@
-import serial_connection
 import time
-import threading
+# reference point for time-to-first-frame-decoded (headless only); taken
+# before any other import so pyserial/crcmod loading is counted
+START_TIME = time.monotonic()
+
+import serial_connection
 import binary_decode
-import binary_encode
-import aprs_is
+import threading
 import queue
-import multiprocessing
+import argparse
+import configparser
+import os
+import sys
+
+# icon shortcuts :: (table, symbol)
+ICONS = {
+    'h': ('/', '-'), 'b': ('/', '<'), 'c': ('/', '>'),
+    'j': ('/', 'j'), 's': ('/', 's'), 'p': ('/', '['),
+    'g': ('/', '&')
+}
+
+# settings accepted from the config file, environment (APRS_<KEY>) and cli
+CONFIG_KEYS = ('mode', 'callsign', 'ssid', 'lat_deg', 'lat_min', 'lon_deg', 'lon_min',
+               'icon', 'message', 'interval', 'port', 'baud', 'settle')
+
+# seconds after the port opens before the first beacon; covers the bootloader
+# of auto-resetting TNCs, which is silent and can't be probed for
+DEFAULT_SETTLE = 2.0
 
 def user_config():
     config = {}
@@ -34,13 +54,8 @@ def user_config():
         # --- ICON SELECTION ---
         print("\nCommon Icons: [H]ome, [B]ike, [C]ar, [J]eep, [S]hip, [P]erson, [G]ateway")
         icon_choice = input("Select Icon: ").strip().lower()
-        icons = {
-            'h': ('/', '-'), 'b': ('/', '<'), 'c': ('/', '>'),
-            'j': ('/', 'j'), 's': ('/', 's'), 'p': ('/', '['),
-            'g': ('/', '&')
-        }
         # default to home if choice is invalid
-        config['table'], config['symbol'] = icons.get(icon_choice, ('/', '-'))
+        config['table'], config['symbol'] = ICONS.get(icon_choice, ('/', '-'))
         
         config['message'] = input("Enter Beacon Message: ").strip()
         
@@ -48,6 +63,157 @@ def user_config():
         config['interval'] = int(interval) * 60 if interval else 600
     return config
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="APRS tx/rx via KISS TNC serial connection")
+    parser.add_argument('-c', '--config', help="INI config file with an [aprs] section")
+    parser.add_argument('--headless', action='store_true',
+                        help="never prompt; take settings from config file / environment / cli only")
+    parser.add_argument('--mode', choices=('rx', 'both'))
+    parser.add_argument('--callsign')
+    parser.add_argument('--ssid', type=int)
+    parser.add_argument('--lat-deg', type=int)
+    parser.add_argument('--lat-min', type=float)
+    parser.add_argument('--lon-deg', type=int)
+    parser.add_argument('--lon-min', type=float)
+    parser.add_argument('--icon', help="h, b, c, j, s, p or g (see interactive setup)")
+    parser.add_argument('--message')
+    parser.add_argument('--interval', type=int, help="beacon interval in minutes")
+    parser.add_argument('--port', help="serial tty device")
+    parser.add_argument('--baud', type=int)
+    parser.add_argument('--settle', type=float,
+                        help=f"seconds after port open before the first beacon (default {DEFAULT_SETTLE})")
+    args = parser.parse_args(argv)
+
+    # settings flags would be ignored by the interactive prompts
+    if not (args.headless or args.config) and any(getattr(args, k) is not None for k in CONFIG_KEYS):
+        parser.error("setting flags need --headless or -c/--config")
+    return args
+
+def _setting(raw, key, cast, default=None):
+    """
+    Reads one setting from the merged raw dict; empty values count as missing.
+
+    :param raw: merged settings (cli > env > file)
+    :param key: setting name
+    :param cast: type to convert the value to
+    :param default: returned when the setting is missing; None means required
+    """
+    value = raw.get(key)
+    if value is None or str(value).strip() == '':
+        if default is None:
+            raise ValueError(f"missing setting '{key}'")
+        return default
+    try:
+        return cast(str(value).strip())
+    except ValueError:
+        raise ValueError(f"invalid value for '{key}' :: {value!r}") from None
+
+def file_config(args, environ=None):
+    """
+    Builds the same config dict as user_config() without prompting.
+    Precedence :: cli > environment (APRS_<KEY>) > config file [aprs] section.
+    Raises ValueError for missing or invalid settings.
+
+    :param args: namespace from parse_args()
+    :param environ: optional environment mapping; defaults to os.environ
+    """
+    environ = os.environ if environ is None else environ
+    raw = {}
+
+    if args.config:
+        # no interpolation; '%' is ordinary in a beacon message
+        parser = configparser.ConfigParser(interpolation=None)
+        try:
+            found = parser.read(args.config)
+            if not found:
+                raise ValueError(f"config file '{args.config}' was not found")
+            if not parser.has_section('aprs'):
+                raise ValueError(f"config file '{args.config}' has no [aprs] section")
+            raw.update(parser['aprs'])
+        except configparser.Error as e:
+            raise ValueError(f"config file '{args.config}' could not be parsed :: {e}") from None
+        unknown = sorted(set(raw) - set(CONFIG_KEYS))
+        if unknown:
+            raise ValueError(f"unknown setting(s) in '{args.config}' :: {', '.join(unknown)}")
+
+    for key in CONFIG_KEYS:
+        env_value = environ.get(f"APRS_{key.upper()}")
+        if env_value:
+            raw[key] = env_value
+        cli_value = getattr(args, key)
+        if cli_value is not None:
+            raw[key] = cli_value
+
+    config = {}
+    mode = _setting(raw, 'mode', str.lower, 'rx')
+    if mode not in ('r', 'rx', 'b', 'both'):
+        raise ValueError(f"invalid value for 'mode' :: {mode!r} (rx or both)")
+    config['mode'] = 'both' if mode in ('b', 'both') else 'rx'
+    config['port'] = _setting(raw, 'port', str, '/dev/ttyACM0')
+    config['baud'] = _setting(raw, 'baud', int, 115200)
+    # callsign is optional in rx mode; without it nothing is i-gated
+    config['callsign'] = _setting(raw, 'callsign', str.upper, '')
+    config['ssid'] = _setting(raw, 'ssid', int, 0)
+    if not 0 <= config['ssid'] <= 15:
+        raise ValueError(f"invalid value for 'ssid' :: {config['ssid']} (0-15)")
+
+    if config['mode'] == 'both':
+        if not config['callsign']:
+            raise ValueError("missing setting 'callsign' (required for TX mode)")
+        config['lat'], config['lon'] = format_gps_to_aprs(
+            _setting(raw, 'lat_deg', int), _setting(raw, 'lat_min', float),
+            _setting(raw, 'lon_deg', int), _setting(raw, 'lon_min', float))
+        icon_choice = _setting(raw, 'icon', str.lower, 'h')
+        if icon_choice not in ICONS:
+            raise ValueError(f"invalid value for 'icon' :: {icon_choice!r} ({', '.join(ICONS)})")
+        config['table'], config['symbol'] = ICONS[icon_choice]
+        config['message'] = _setting(raw, 'message', str, '')
+        interval = _setting(raw, 'interval', int, 10)
+        if interval < 1:
+            raise ValueError(f"invalid value for 'interval' :: {interval} (minutes, 1 or more)")
+        config['interval'] = interval * 60
+        config['settle'] = _setting(raw, 'settle', float, DEFAULT_SETTLE)
+        if config['settle'] < 0:
+            raise ValueError(f"invalid value for 'settle' :: {config['settle']} (seconds, 0 or more)")
+    return config
+
+def load_config(argv=None):
+    """
+    Interactive setup unless started with --headless or -c/--config.
+    APRS_<KEY> environment variables only apply in non-interactive mode.
+    """
+    args = parse_args(argv)
+    if args.headless or args.config:
+        config = file_config(args)
+        config['headless'] = True
+        return config
+
+    config = user_config()
+    config.setdefault('callsign', '')
+    config.setdefault('ssid', 0)
+    config['port'] = '/dev/ttyACM0'
+    config['baud'] = 115200
+    config['settle'] = DEFAULT_SETTLE
+    config['headless'] = False
+    return config
+
+def build_beacon(config):
+    """
+    Builds the KISS beacon frame once; the payload never changes between beacons.
+    """
+    import binary_encode
+
+    protocol_encode = binary_encode.BinaryEncoder()
+    # Format: !3248.20N/11709.09W>Message
+    # Note: The 'Table' sits between Lat and Lon, the 'Symbol' sits after Lon.
+    payload_str = f"!{config['lat']}{config['table']}{config['lon']}{config['symbol']}{config['message']}"
+    raw_ax25 = protocol_encode.construct_ax25_frame(
+        config['callsign'],
+        config['ssid'],
+        payload=payload_str
+    )
+    return protocol_encode.kiss_stuff(raw_ax25)
+
 def format_gps_to_aprs(lat_deg, lat_min, lon_deg, lon_lon_min):
     """
     Takes GPS Degrees/Minutes and formats them directly for APRS.
@@ -67,11 +233,14 @@ def format_gps_to_aprs(lat_deg, lat_min, lon_deg, lon_lon_min):
 serial_lock = threading.Lock() #  CRUCIAL : used to protect the SerialTTY object
 FEND = b'\xc0'
 
-def rx_streaming_thread(tnc_interface, protocol_decode, lock, rx_gate_q, callsign):
+def rx_streaming_thread(tnc_interface, protocol_decode, lock, rx_gate_q, callsign, start_time=None):
     """
     RX streaming logic: External function, manages concurrency and framing.
+    start_time (monotonic) is the reference for time-to-first-frame-decoded;
+    it is only passed in headless mode, where no prompts inflate it.
     """
     current_data = b'' # Buffer to collect bytes
+    first_decoded = False
 
     while True:
         try:
@@ -106,12 +275,16 @@ def rx_streaming_thread(tnc_interface, protocol_decode, lock, rx_gate_q, callsig
                     # 3. process the frame in the binary decoder
                     if len(complete_frame) > 2: # ignore empty frames like 0xc0 0xc0
                         result = protocol_decode.decode_frame(complete_frame)
+                        if result and not first_decoded:
+                            first_decoded = True
+                            report_first_frame(tnc_interface, start_time)
                         if result and callsign != result['source']:
-                            tnc2_str = protocol_decode.to_tnc2(result, callsign)
-                            rx_gate_q.put(tnc2_str)
+                            if rx_gate_q is not None:
+                                tnc2_str = protocol_decode.to_tnc2(result, callsign)
+                                rx_gate_q.put(tnc2_str)
                             print(f"Packet Received: {result['source']} -> {result['destination']}")
                             print(f"Payload: {result['payload']}")
-                        elif callsign == result['source']:
+                        elif result and callsign == result['source']:
                             print(f"Packet Duplicate :: callsign :: {result['source']} :: {callsign}")
                         else:
                             print("Packet Decode failed!")
@@ -128,6 +301,50 @@ def rx_streaming_thread(tnc_interface, protocol_decode, lock, rx_gate_q, callsig
             break
 
 
+def report_first_frame(tnc_interface, start_time=None):
+    """
+    Prints time-to-first-frame-decoded; since process start (headless only)
+    and since the TNC reported ready.
+    """
+    now = time.monotonic()
+    timings = []
+    if start_time is not None:
+        timings.append(f"{now - start_time:.3f}s after start")
+    if tnc_interface.ready_time is not None:
+        timings.append(f"{now - tnc_interface.ready_time:.3f}s after TNC ready")
+    print(f"First frame decoded :: {' :: '.join(timings) or 'TNC never reported ready'}")
+
+
+def check_ready(tnc_interface, headless):
+    """
+    Startup decision after the one readiness probe in SerialTTY.__init__.
+    Headless exits non-zero so the supervisor restarts us; interactive
+    carries on like before the probe existed.
+    """
+    if tnc_interface.ready:
+        return True
+    if headless:
+        sys.exit(f"ERROR :: TNC not ready :: {tnc_interface.port}")
+    print(f"WARNING :: TNC not ready :: {tnc_interface.port} :: continuing anyway")
+    return False
+
+
+def beacon_due(tnc_interface, last_tx_time, now, interval, settle):
+    """
+    True when the next beacon should go out. The first one waits until
+    settle seconds after the port opened, so an auto-resetting TNC is out of
+    its bootloader; only timestamps are checked, the port is never touched.
+
+    :param last_tx_time: monotonic time of the last beacon, None before the first
+    :param now: current monotonic time
+    :param interval: seconds between beacons
+    :param settle: seconds after port open before the first beacon
+    """
+    if last_tx_time is None:
+        return tnc_interface.open_time is None or now - tnc_interface.open_time >= settle
+    return now - last_tx_time >= interval
+
+
 def tx_beacon(tnc_interface, kiss_frame, lock):
     """
     Example of a TX function that can be called from the main thread.
@@ -141,25 +358,41 @@ def tx_beacon(tnc_interface, kiss_frame, lock):
 
 # --- APRS iGate Application Entry Point ---
 if __name__ == '__main__':
-    # get config
-    config = user_config()
+    # get config; bad headless settings exit with a one-line message
+    try:
+        config = load_config()
+    except ValueError as e:
+        sys.exit(f"ERROR :: config :: {e}")
     # construct callsign and ssid
-    call_ssid = f"{config['callsign']}-{config['ssid']}"
+    call_ssid = f"{config['callsign']}-{config['ssid']}" if config['callsign'] else ''
+
+    # build the beacon before opening the port so nothing is encoded in the tx loop
+    if config['mode'] == 'both':
+        kiss_packet = build_beacon(config)
 
     try:
         # Initialize the shared objects
-        tnc_interface = serial_connection.SerialTTY(baud_rate=115200)
+        tnc_interface = serial_connection.SerialTTY(port=config['port'], baud_rate=config['baud'])
         print(f"visible ports : {tnc_interface.available_ports}")
+        # the probe already ran; the port is never drained once rx is running
+        check_ready(tnc_interface, config['headless'])
         protocol_decode = binary_decode.BinaryDecoder()
-        gateway_q_instance = queue.Queue()
-        igate_thread = aprs_is.IGateway(call_ssid, gateway_q=gateway_q_instance)
-        igate_thread.daemon = True
-        igate_thread.start()
+
+        # i-gate only with a callsign to log in with; aprslib is not loaded otherwise
+        gateway_q_instance = None
+        if call_ssid:
+            import aprs_is
+
+            gateway_q_instance = queue.Queue()
+            igate_thread = aprs_is.IGateway(call_ssid, gateway_q=gateway_q_instance)
+            igate_thread.daemon = True
+            igate_thread.start()
         
         # Start the RX streaming thread, passing the shared objects
         rx_thread = threading.Thread(
             target=rx_streaming_thread, 
-            args=(tnc_interface, protocol_decode, serial_lock, gateway_q_instance, call_ssid)
+            args=(tnc_interface, protocol_decode, serial_lock, gateway_q_instance, call_ssid,
+                  START_TIME if config['headless'] else None)
         )
         rx_thread.daemon = True
         rx_thread.start()
@@ -172,30 +405,17 @@ if __name__ == '__main__':
 
     # tx loop if enabled
     if config['mode'] == 'both':
-        protocol_encode = binary_encode.BinaryEncoder()
-        last_tx_time = 0 # force immediate first transmission
-        
-        # Format: !3248.20N/11709.09W>Message
-        # Note: The 'Table' sits between Lat and Lon, the 'Symbol' sits after Lon.
-        payload_str = f"!{config['lat']}{config['table']}{config['lon']}{config['symbol']}{config['message']}"
+        last_tx_time = None # first transmission as soon as the TNC has settled
 
         try:
             while True:
-                current_time = time.time()
-                if current_time - last_tx_time >= config['interval']:
-                    # Build and wrap the packet
-                    raw_ax25 = protocol_encode.construct_ax25_frame(
-                        config['callsign'], 
-                        config['ssid'], 
-                        payload=payload_str
-                    )
-                    kiss_packet = protocol_encode.kiss_stuff(raw_ax25)
-                    
+                current_time = time.monotonic()
+                if beacon_due(tnc_interface, last_tx_time, current_time, config['interval'], config['settle']):
                     # Transmit
                     tx_beacon(tnc_interface, kiss_packet, serial_lock)
                     last_tx_time = current_time
                 
-                time.sleep(1) # Check timer every second
+                time.sleep(0.1) # Check timer every 100 ms
         except Exception as e:
             print(f"Application error :: tx loop :: {e}")
         except KeyboardInterrupt:
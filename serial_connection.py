@@ -5,10 +5,15 @@ import time
 
 class SerialTTY:
 
-    def __init__(self, port='/dev/ttyACM0', baud_rate=9600, timeout=0):
+    def __init__(self, port='/dev/ttyACM0', baud_rate=9600, timeout=0, ready_timeout=2.0, quiet=0.25):
         self.port = port
         self.baudrate = baud_rate
         self.timeout = timeout
+        self.ready_timeout = ready_timeout
+        self.quiet = quiet
+        self.ready = False
+        self.ready_time = None
+        self.open_time = None
         print(f"Opening serial port: {self.port} at {self.baudrate}")
         try:
             self.ser = serial.Serial(
@@ -16,10 +21,10 @@ class SerialTTY:
                     baudrate=self.baudrate,
                     timeout=self.timeout
             )
-            time.sleep(2)
             if self.ser.is_open:
+                self.open_time = time.monotonic()
                 print("Connection established")
-                self.ser.flushInput()
+                self.wait_ready()
         except SerialException as e:
             print(f"Error connecting : {self.port} : {e}")
             self.ser = None
@@ -29,6 +34,43 @@ class SerialTTY:
 
         self.available_ports = serial.tools.list_ports.comports()
 
+    def wait_ready(self, poll=0.02):
+        """
+        readiness probe instead of a fixed settle sleep; auto-resetting TNCs
+        print boot chatter after the port opens, so the device is treated as
+        ready once the input line has been quiet for self.quiet seconds.
+        chatter is discarded. gives up after self.ready_timeout seconds.
+        a TNC that boots silently for longer than self.quiet is not detected,
+        so TX must also wait out its reset window after open_time.
+        called once from __init__; never call it while another thread reads
+        the port, everything that arrives here is dropped.
+
+        :param self: self reference
+        :param poll: seconds between probes
+        """
+        start = time.monotonic()
+        deadline = start + self.ready_timeout
+        last_activity = start
+        while True:
+            now = time.monotonic()
+            try:
+                waiting = self.ser.in_waiting
+                if waiting > 0:
+                    self.ser.read(waiting)
+                    last_activity = now
+                elif now - last_activity >= self.quiet:
+                    self.ready = True
+                    self.ready_time = now
+                    print(f"TNC ready after {now - start:.3f}s : {self.port}")
+                    return True
+            except (SerialException, OSError) as e:
+                print(f"Port probe failed : {self.port} : {e}")
+                return False
+            if now >= deadline:
+                print(f"Port not ready after {self.ready_timeout}s : {self.port}")
+                return False
+            time.sleep(poll)
+
     def list_ports(self):
         return self.available_ports
 
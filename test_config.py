@@ -0,0 +1,107 @@
+import importlib.util
+import os
+import pytest
+
+# __main__.py can't be imported by name, load it as a regular module
+spec = importlib.util.spec_from_file_location(
+    'aprs_main', os.path.join(os.path.dirname(os.path.abspath(__file__)), '__main__.py'))
+aprs_main = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(aprs_main)
+
+TX_ARGS = ['--headless', '--mode', 'both', '--callsign', 'n0call',
+           '--lat-deg', '32', '--lat-min', '47.99', '--lon-deg', '117', '--lon-min', '1.59']
+
+def write_ini(tmp_path, body):
+    path = tmp_path / 'aprs.ini'
+    path.write_text("[aprs]\n" + body)
+    return str(path)
+
+def test_precedence_cli_over_env_over_ini(tmp_path):
+    ini = write_ini(tmp_path, "port = /dev/ini\nbaud = 9600\nssid = 1\n")
+    args = aprs_main.parse_args(['-c', ini, '--ssid', '3'])
+    config = aprs_main.file_config(args, {'APRS_PORT': '/dev/env', 'APRS_SSID': '2'})
+
+    assert config['ssid'] == 3              # cli
+    assert config['port'] == '/dev/env'     # env
+    assert config['baud'] == 9600           # ini
+
+def test_tx_mode_missing_settings():
+    args = aprs_main.parse_args(['--headless', '--mode', 'both', '--callsign', 'n0call'])
+    with pytest.raises(ValueError, match="lat_deg"):
+        aprs_main.file_config(args, {})
+
+def test_tx_mode_missing_callsign():
+    args = aprs_main.parse_args(['--headless', '--mode', 'both'])
+    with pytest.raises(ValueError, match="callsign"):
+        aprs_main.file_config(args, {})
+
+def test_empty_values_count_as_missing(tmp_path):
+    ini = write_ini(tmp_path, "mode = both\ncallsign = N0CALL\nssid =\nlat_deg =\n")
+    args = aprs_main.parse_args(['-c', ini])
+    with pytest.raises(ValueError, match="missing setting 'lat_deg'"):
+        aprs_main.file_config(args, {})
+
+    ini = write_ini(tmp_path, "ssid =\n")
+    config = aprs_main.file_config(aprs_main.parse_args(['-c', ini]), {})
+    assert config['ssid'] == 0
+
+def test_invalid_values(tmp_path):
+    for body, key in (("ssid = 16\n", 'ssid'), ("mode = tx\n", 'mode'), ("baud = fast\n", 'baud')):
+        ini = write_ini(tmp_path, body)
+        with pytest.raises(ValueError, match=key):
+            aprs_main.file_config(aprs_main.parse_args(['-c', ini]), {})
+
+def test_percent_in_message(tmp_path):
+    ini = write_ini(tmp_path, "mode = both\ncallsign = N0CALL\nlat_deg = 32\nlat_min = 47.99\n"
+                              "lon_deg = 117\nlon_min = 1.59\nmessage = batt 90%\n")
+    config = aprs_main.load_config(['-c', ini])
+
+    assert config['message'] == 'batt 90%'
+
+def test_missing_aprs_section(tmp_path):
+    path = tmp_path / 'aprs.ini'
+    path.write_text("[igate]\nport = /dev/ttyUSB0\n")
+    with pytest.raises(ValueError, match=r"no \[aprs\] section"):
+        aprs_main.file_config(aprs_main.parse_args(['-c', str(path)]), {})
+
+def test_unknown_key(tmp_path):
+    ini = write_ini(tmp_path, "callsgin = N0CALL\n")
+    with pytest.raises(ValueError, match="callsgin"):
+        aprs_main.file_config(aprs_main.parse_args(['-c', ini]), {})
+
+def test_unknown_icon():
+    args = aprs_main.parse_args(TX_ARGS + ['--icon', 'x'])
+    with pytest.raises(ValueError, match="icon"):
+        aprs_main.file_config(args, {})
+
+def test_interval_must_be_positive():
+    for interval in ('0', '-5'):
+        args = aprs_main.parse_args(TX_ARGS + ['--interval', interval])
+        with pytest.raises(ValueError, match="interval"):
+            aprs_main.file_config(args, {})
+
+def test_missing_config_file(tmp_path):
+    args = aprs_main.parse_args(['-c', str(tmp_path / 'nope.ini')])
+    with pytest.raises(ValueError, match="not found"):
+        aprs_main.file_config(args, {})
+
+def test_rx_only_without_callsign():
+    config = aprs_main.file_config(aprs_main.parse_args(['--headless']), {})
+
+    assert config['mode'] == 'rx'
+    assert config['callsign'] == ''
+    assert config['port'] == '/dev/ttyACM0'
+    assert 'lat' not in config
+
+def test_tx_mode_config_and_beacon():
+    config = aprs_main.file_config(aprs_main.parse_args(TX_ARGS), {})
+
+    assert (config['lat'], config['lon']) == ('3247.99N', '11701.59W')
+    assert config['interval'] == 600
+    assert config['settle'] == aprs_main.DEFAULT_SETTLE
+    beacon = aprs_main.build_beacon(config)
+    assert beacon.startswith(b'\xc0\x00') and beacon.endswith(b'\xc0')
+
+def test_setting_flags_need_headless():
+    with pytest.raises(SystemExit):
+        aprs_main.parse_args(['--port', '/dev/ttyUSB0'])
@@ -0,0 +1,77 @@
+from unittest import mock
+import pytest
+import serial_connection
+from test_config import aprs_main
+
+class FakeSerial:
+    """stands in for serial.Serial; in_waiting replays a list of byte counts"""
+
+    def __init__(self, waiting, **kwargs):
+        self.is_open = True
+        self._waiting = list(waiting)
+        self.read_sizes = []
+        self.written = []
+
+    @property
+    def in_waiting(self):
+        return self._waiting.pop(0) if self._waiting else 0
+
+    def read(self, size):
+        self.read_sizes.append(size)
+        return b'\x00' * size
+
+    def write(self, data):
+        self.written.append(data)
+
+    def flush(self):
+        pass
+
+def make_tty(waiting, **kwargs):
+    with mock.patch('serial.Serial', lambda **kw: FakeSerial(waiting, **kw)), \
+            mock.patch('serial.tools.list_ports.comports', return_value=[]):
+        return serial_connection.SerialTTY(port='/dev/fake', **kwargs)
+
+def test_wait_ready_after_boot_chatter():
+    # a few reads of boot chatter, then the line goes quiet
+    tty = make_tty([12, 5, 0, 3], ready_timeout=1.0, quiet=0.05)
+
+    assert tty.ready
+    assert tty.ready_time >= tty.open_time + 0.05
+    assert sum(tty.ser.read_sizes) == 20
+
+def test_wait_ready_timeout():
+    # device never stops talking
+    tty = make_tty([1] * 1000, ready_timeout=0.1, quiet=0.05)
+
+    assert not tty.ready
+    assert tty.ready_time is None
+
+def test_check_ready():
+    assert aprs_main.check_ready(make_tty([], quiet=0.01), headless=True)
+
+    busy = make_tty([1] * 1000, ready_timeout=0.05, quiet=0.05)
+    assert aprs_main.check_ready(busy, headless=False) is False
+    with pytest.raises(SystemExit):
+        aprs_main.check_ready(busy, headless=True)
+
+def test_first_beacon_waits_for_settle():
+    tty = make_tty([], quiet=0.01)
+    opened = tty.open_time
+
+    assert not aprs_main.beacon_due(tty, None, opened + 1.9, interval=600, settle=2.0)
+    assert aprs_main.beacon_due(tty, None, opened + 2.0, interval=600, settle=2.0)
+    assert not aprs_main.beacon_due(tty, opened + 2.0, opened + 601, interval=600, settle=2.0)
+    assert aprs_main.beacon_due(tty, opened + 2.0, opened + 602, interval=600, settle=2.0)
+
+def test_tx_never_drains_port_after_probe():
+    # probe timed out on a busy line; tx decisions and writes must not read
+    # the port, that belongs to the rx thread from here on
+    tty = make_tty([1] * 1000, ready_timeout=0.05, quiet=0.05)
+    reads_after_probe = len(tty.ser.read_sizes)
+
+    now = tty.open_time + 5
+    assert aprs_main.beacon_due(tty, None, now, interval=600, settle=2.0)
+    aprs_main.tx_beacon(tty, b'\xc0\x00beacon\xc0', aprs_main.serial_lock)
+
+    assert len(tty.ser.read_sizes) == reads_after_probe
+    assert tty.ser.written == [b'\xc0\x00beacon\xc0']